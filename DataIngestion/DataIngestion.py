@@ -17,10 +17,19 @@ Usage:
 
 Example:
     python DataIngestion.py "https://www.iso20022.org/ISO10383_MIC.xls" "sheet1"
-Attributes:
 
-TODO:
-    Execution of function must be done using AWS lambda.
+AWS lambda:
+    Use DataIngestion.handler as the handler with an event like
+    {"bucket": "<aws_s3_bucket_name>", "url": "<url_file_path>",
+     "sheet": "<sheet_name>"} and set DATA_INGESTION_OUTPUT_DIR to /tmp.
+
+Output settings:
+    DATA_INGESTION_OUTPUT_FORMAT: parquet (default, requires pyarrow) or json
+    DATA_INGESTION_OUTPUT_COMPRESSION: none (default) or zstd (requires
+        zstandard) for the json output
+    DATA_INGESTION_OUTPUT_UPLOAD: file (default) or stream (requires
+        smart_open) to write the output straight to the aws s3 bucket
+Attributes:
 """
 
 __author__ = "Kumar Gaurav"
@@ -36,13 +45,21 @@ __status__ = "Released"
 import os
 import sys
 import json
-import mimetypes
+import base64
+import datetime
+import hashlib
+import shutil
+import tempfile
+import itertools
+import functools
+import numbers
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Return codes
 SUCCESS = 0
 GENERIC_ERR = 1
 IMPORT_ERR = 2
-ATTRIBUTE_ERR = 3
 INVALID_ARG_ERR = 4
 S3_BUCKET_CR_ERR = 5
 
@@ -54,156 +71,291 @@ SHEET_NAME = None
 CONTENT_TYPE_TEXT = 'text'
 CONTENT_TYPE_HTML = 'html'
 
+# Excel workbook extensions by content type
+EXTENSIONS_BY_CONTENT_TYPE = {
+    'application/vnd.ms-excel': ('.xls', '.xlb', '.xlt'),
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet':
+        ('.xlsx',),
+    'application/vnd.ms-excel.sheet.macroenabled.12': ('.xlsm',),
+    'application/vnd.ms-excel.sheet.binary.macroenabled.12': ('.xlsb',),
+}
+
 # Local file name paths
+# The output directory can be overridden with DATA_INGESTION_OUTPUT_DIR, e.g.
+# to /tmp on AWS lambda where the script directory is read only
 SCRIPT_BASE_PATH = os.path.dirname(os.path.realpath(__file__))
-OUTPUT_FILE_PATH = os.path.join(SCRIPT_BASE_PATH, "output",
-                                "dataingestion")
-OUTPUT_FILE_JSON = os.path.join(SCRIPT_BASE_PATH, "output",
-                                "dataingestion.json")
+OUTPUT_DIR_PATH = os.environ.get('DATA_INGESTION_OUTPUT_DIR',
+                                 os.path.join(SCRIPT_BASE_PATH, "output"))
+OUTPUT_FILE_PATH = os.path.join(OUTPUT_DIR_PATH, "dataingestion")
+OUTPUT_FILE_JSON = os.path.join(OUTPUT_DIR_PATH, "dataingestion.json")
 JSON_FILE_PATH_ON_AWS = 'DataIngestion/' + os.path.basename(OUTPUT_FILE_JSON)
+OUTPUT_FILE_PARQUET = os.path.join(OUTPUT_DIR_PATH, "dataingestion.parquet")
+PARQUET_FILE_PATH_ON_AWS = 'DataIngestion/' + os.path.basename(
+    OUTPUT_FILE_PARQUET)
+ZSTD_FILE_EXT = '.zst'
+ZSTD_COMPRESSION_LEVEL = 3
+OUTPUT_WRITE_BUFFER_SIZE = 1024 * 1024
+ARROW_BATCH_SIZE = 10000
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_COMPRESSION_LEVEL = 3
+# The output files are opened with os.open, in binary mode on windows. The
+# output directory is opened once where os.open supports dir_fd (POSIX), else
+# the files are opened by their path
+OUTPUT_FILE_FLAGS_BINARY = getattr(os, 'O_BINARY', 0)
+OUTPUT_DIR_FD_SUPPORTED = os.open in os.supports_dir_fd
+
+# Output format constants
+# The records are written as parquet (requires pyarrow) by default, the json
+# output of the earlier versions is selected with
+# DATA_INGESTION_OUTPUT_FORMAT=json. The json output is compressed (requires
+# zstandard) with DATA_INGESTION_OUTPUT_COMPRESSION=zstd
+OUTPUT_FORMAT_JSON = 'json'
+OUTPUT_FORMAT_PARQUET = 'parquet'
+OUTPUT_FORMAT = os.environ.get('DATA_INGESTION_OUTPUT_FORMAT',
+                               OUTPUT_FORMAT_PARQUET).strip().lower()
+OUTPUT_COMPRESSION_NONE = 'none'
+OUTPUT_COMPRESSION_ZSTD = 'zstd'
+OUTPUT_COMPRESSION = os.environ.get('DATA_INGESTION_OUTPUT_COMPRESSION',
+                                    OUTPUT_COMPRESSION_NONE).strip().lower()
+# The output is written to the local file and uploaded by default, it is
+# streamed straight to the aws s3 bucket (requires smart_open) with
+# DATA_INGESTION_OUTPUT_UPLOAD=stream
+OUTPUT_UPLOAD_FILE = 'file'
+OUTPUT_UPLOAD_STREAM = 'stream'
+OUTPUT_UPLOAD = os.environ.get('DATA_INGESTION_OUTPUT_UPLOAD',
+                               OUTPUT_UPLOAD_FILE).strip().lower()
+CONTENT_TYPE_JSON = 'application/json'
+CONTENT_TYPE_PARQUET = 'application/vnd.apache.parquet'
+
+# AWS S3 transfer constants
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+S3_MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+S3_MAX_CONCURRENCY = 10
+S3_MAX_POOL_CONNECTIONS = 50
+S3_MAX_ATTEMPTS = 10
+
+# Download constants
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+HTTP_RETRY_TOTAL = 5
+HTTP_RETRY_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUS_LIST = [502, 503, 504]
+# Seconds to wait for the connection and for every read of the streamed body,
+# the retries do not fire on a stalled connection
+HTTP_TIMEOUT = 300
+RANGE_DOWNLOAD_WORKERS = 8
+RANGE_DOWNLOAD_PART_SIZE = 8 * 1024 * 1024
 
 # Required python imports
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    import numpy as np
     import pandas as pd
     import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
 except ImportError as ie:
     print("Import Error!! Unable to import module(s)."
           "\nInstall the module and try again..."
           "\nException: ", ie)
     sys.exit(IMPORT_ERR)
 
+# Optional python imports
+try:
+    # Native excel reader used for streaming the sheet rows
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
 
-class DataIngestion(object):
-    """
-    The class is responsible to perform the data ingestion task. It will
-    download the file from url parse it, convert it in json and store in
-    Amazon s3 bucket.
+try:
+    # Read-only streaming reader for xlsx files
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
 
-    Attributes:
-        __aws_bucket_name (str): Holds the aws_bucket_name
-        __response (requests): Holds the object type of requests connection.
-        __url_file_path (str): Holds the url path of the file to be downloaded.
-        __sheet_name (str): Holds the sheet name of the workbook file which
-                            needs to be parsed.
-
-    Raises:
-        AttributeError: It raises attribute error exception when the attribute
-                        is not present in the class.
-    """
+try:
+    # Native json encoder used for writing the records
+    import orjson
+except ImportError:
+    orjson = None
 
-    def __init__(self, aws_bucket_name, url_file_path_argv, sheet_name_argv):
-        """Object initializer to initialize the class members
+try:
+    # Columnar tables used for converting the data frame records
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
-        Args:
-            aws_bucket_name: AWS bucket name coming from command line argument
-            url_file_path_argv: File path coming from command line
-                                argument
-            sheet_name_argv: Sheet name of the file coming from the
-                             command line argument
-        """
-        self.__response = None
-        self.__aws_bucket_name = aws_bucket_name
-        self.__url_file_path = url_file_path_argv
-        self.__sheet_name = sheet_name_argv
+try:
+    # Parquet writer of the records
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
 
-    def __getattr__(self, item):
-        """Prints error message if attribute is not found"""
-        print("Class attribute not found: ", item)
-        return ATTRIBUTE_ERR
+try:
+    # Compression of the json file before uploading
+    import zstandard as zstd
+except ImportError:
+    zstd = None
 
-    def __getattribute__(self, item):
-        """Checks for every attribute"""
-        if not item:
-            raise AttributeError
+try:
+    # Streaming the json file straight to aws s3 bucket
+    import smart_open
+except ImportError:
+    smart_open = None
+
+# Checking the output settings, the libraries they require must be installed
+if OUTPUT_FORMAT not in (OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_PARQUET) or \
+        OUTPUT_COMPRESSION not in (OUTPUT_COMPRESSION_NONE,
+                                   OUTPUT_COMPRESSION_ZSTD) or \
+        (OUTPUT_FORMAT == OUTPUT_FORMAT_PARQUET and
+         OUTPUT_COMPRESSION != OUTPUT_COMPRESSION_NONE):
+    print("Invalid output settings!! Output format:", OUTPUT_FORMAT,
+          "Output compression:", OUTPUT_COMPRESSION,
+          "\nSupported: json with none/zstd compression, parquet with none "
+          "compression (parquet is compressed internally)")
+    sys.exit(INVALID_ARG_ERR)
+
+if OUTPUT_FORMAT == OUTPUT_FORMAT_PARQUET and pq is None:
+    print("Import Error!! Unable to import pyarrow required by the parquet "
+          "output.\nInstall the module or set DATA_INGESTION_OUTPUT_FORMAT="
+          "json and try again...")
+    sys.exit(IMPORT_ERR)
 
-        return object.__getattribute__(self, item)
+if OUTPUT_COMPRESSION == OUTPUT_COMPRESSION_ZSTD and zstd is None:
+    print("Import Error!! Unable to import zstandard required by the zstd "
+          "output compression.\nInstall the module and try again...")
+    sys.exit(IMPORT_ERR)
 
-    def __repr__(self):
-        """To print the printable version of the object"""
-        return "DataIngestion(\nResponse=%s," \
-               "\nURL File Path=%s," \
-               "\nSheet name=%s" \
-               "\n)" %\
-               (self.__response,
-                self.__url_file_path,
-                self.__sheet_name)
+if OUTPUT_UPLOAD not in (OUTPUT_UPLOAD_FILE, OUTPUT_UPLOAD_STREAM):
+    print("Invalid output settings!! Output upload:", OUTPUT_UPLOAD,
+          "\nSupported: file or stream")
+    sys.exit(INVALID_ARG_ERR)
 
-    @property
-    def prop_response(self):
-        """requests: Property to get the object of requests"""
-        return self.__response
+if OUTPUT_UPLOAD == OUTPUT_UPLOAD_STREAM and smart_open is None:
+    print("Import Error!! Unable to import smart_open required by the "
+          "streamed output upload.\nInstall the module and try again...")
+    sys.exit(IMPORT_ERR)
 
-    @prop_response.setter
-    def prop_response(self, value):
-        """Property to set the request obj
+# AWS S3 client shared across the invocations of a warm container
+S3_CLIENT = boto3.client("s3", config=Config(
+    max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+    retries={'max_attempts': S3_MAX_ATTEMPTS, 'mode': 'adaptive'}))
 
-        Args:
-             value (requests): response is passed as argument
-        """
-        self.__response = value
 
-    @prop_response.deleter
-    def prop_response(self):
-        """Property to delete the requests object"""
-        del self.__response
+class HashingWriter(object):
+    """
+    The class wraps a binary file object and updates the hash with every chunk
+    written to it, so that the digest is computed in the same pass as the
+    write.
 
-    @property
-    def prop_aws_bucket_name(self):
-        """requests: Property to get the aws bucket name"""
-        return self.__aws_bucket_name
+    Attributes:
+        inner: Holds the wrapped binary file object.
+        hasher: Holds the hashlib object updated with the written bytes, None
+                when only the size is needed.
+        size (int): Holds the number of bytes written.
+    """
+    __slots__ = ('inner', 'hasher', 'size')
 
-    @prop_aws_bucket_name.setter
-    def prop_aws_bucket_name(self, value):
-        """Property to set the aws bucket name
+    def __init__(self, inner, hasher):
+        """Object initializer to initialize the class members
 
         Args:
-             value (requests): response is passed as argument
+            inner: Binary file object the bytes are written to
+            hasher: hashlib object to be updated with the written bytes, None
+                    to only count them
         """
-        self.__aws_bucket_name = value
+        self.inner = inner
+        self.hasher = hasher
+        self.size = 0
 
-    @prop_aws_bucket_name.deleter
-    def prop_aws_bucket_name(self):
-        """Property to delete the aws bucket name"""
-        del self.__aws_bucket_name
+    def write(self, data):
+        """Updates the hash and writes the bytes to the wrapped file object"""
+        if self.hasher is not None:
+            self.hasher.update(data)
+        self.size += len(data)
+        return self.inner.write(data)
 
-    @property
-    def prop_url_file_path(self):
-        """str: Property to get the url file path"""
-        return self.__url_file_path
+    def flush(self):
+        """Flushes the wrapped file object"""
+        self.inner.flush()
 
-    @prop_url_file_path.setter
-    def prop_url_file_path(self, value):
-        """Property to set the url file path
+    @property
+    def closed(self):
+        """bool: Closed status of the wrapped file object"""
+        return self.inner.closed
 
-        Args:
-             value (str): Url file path passed as an argument
-        """
-        self.__url_file_path = value
 
-    @prop_url_file_path.deleter
-    def prop_url_file_path(self):
-        """Property to delete the url file path"""
-        del self.__url_file_path
+class DataIngestion(object):
+    """
+    The class is responsible to perform the data ingestion task. It will
+    download the file from url parse it, convert it in parquet or json and
+    store in Amazon s3 bucket.
 
-    @property
-    def prop_sheet_name(self):
-        """str: Property to get the sheet name"""
-        return self.__sheet_name
+    Attributes:
+        aws_bucket_name (str): Holds the aws_bucket_name
+        response (requests): Holds the object type of requests connection.
+        __session (requests.Session): Holds the session used for the requests.
+        __output_dir_fd (int): Holds the file descriptor of the output
+                               directory while the task is performed.
+        __output_file_path (str): Holds the local path of the downloaded file.
+        __output_format (str): Holds the format of the output, parquet or json.
+        __output_data_path (str): Holds the local path of the output file.
+        __output_data_key (str): Holds the key of the output file on aws s3.
+        __output_data_md5 (str): Holds the base64 MD5 digest of the output
+                                 file.
+        url_file_path (str): Holds the url path of the file to be downloaded.
+        sheet_name (str): Holds the sheet name of the workbook file which
+                          needs to be parsed.
+    """
+    __slots__ = ('response', 'aws_bucket_name', 'url_file_path', 'sheet_name',
+                 '__session', '__output_dir_fd', '__output_file_path',
+                 '__output_format',
+                 '__output_data_path', '__output_data_key',
+                 '__output_data_md5')
 
-    @prop_sheet_name.setter
-    def prop_sheet_name(self, value):
-        """Property to set the url file path
+    def __init__(self, aws_bucket_name, url_file_path_argv, sheet_name_argv):
+        """Object initializer to initialize the class members
 
         Args:
-            value (str): Sheet name to be passed as an argument.
+            aws_bucket_name: AWS bucket name coming from command line argument
+            url_file_path_argv: File path coming from command line
+                                argument
+            sheet_name_argv: Sheet name of the file coming from the
+                             command line argument
         """
-        self.__sheet_name = value
+        self.response = None
+        self.__session = None
+        self.__output_dir_fd = None
+        self.__output_file_path = OUTPUT_FILE_PATH
+        # Writing the output in the configured format and compression
+        if OUTPUT_FORMAT == OUTPUT_FORMAT_PARQUET:
+            self.__output_format = OUTPUT_FORMAT_PARQUET
+            self.__output_data_path = OUTPUT_FILE_PARQUET
+            self.__output_data_key = PARQUET_FILE_PATH_ON_AWS
+        elif OUTPUT_COMPRESSION == OUTPUT_COMPRESSION_ZSTD:
+            self.__output_format = OUTPUT_FORMAT_JSON
+            self.__output_data_path = OUTPUT_FILE_JSON + ZSTD_FILE_EXT
+            self.__output_data_key = JSON_FILE_PATH_ON_AWS + ZSTD_FILE_EXT
+        else:
+            self.__output_format = OUTPUT_FORMAT_JSON
+            self.__output_data_path = OUTPUT_FILE_JSON
+            self.__output_data_key = JSON_FILE_PATH_ON_AWS
+        self.__output_data_md5 = None
+        self.aws_bucket_name = aws_bucket_name
+        self.url_file_path = url_file_path_argv
+        self.sheet_name = sheet_name_argv
 
-    @prop_sheet_name.deleter
-    def prop_sheet_name(self):
-        """Property to delete the sheet name"""
-        del self.__sheet_name
+    def __repr__(self):
+        """To print the printable version of the object"""
+        return "DataIngestion(\nResponse=%s," \
+               "\nURL File Path=%s," \
+               "\nSheet name=%s" \
+               "\n)" %\
+               (self.response,
+                self.url_file_path,
+                self.sheet_name)
 
     @staticmethod
     def help():
@@ -223,15 +375,15 @@ class DataIngestion(object):
         ret_status = False
         try:
             if len(sys.argv) == 4:
-                self.__aws_bucket_name = sys.argv[1].strip("'").strip()
-                self.__url_file_path = sys.argv[2].strip("'").strip()
-                self.__sheet_name = sys.argv[3].strip("'").strip()
+                self.aws_bucket_name = sys.argv[1].strip("'").strip()
+                self.url_file_path = sys.argv[2].strip("'").strip()
+                self.sheet_name = sys.argv[3].strip("'").strip()
                 print("\nArguments: ")
-                print("Info: AWS S3 Bucket Name: ", self.__aws_bucket_name)
-                print("Info: URL Path: ", self.__url_file_path)
-                print("Info: Sheet name to parse: ", self.__sheet_name)
-                if self.__aws_bucket_name and self.__url_file_path and \
-                        self.__sheet_name:
+                print("Info: AWS S3 Bucket Name: ", self.aws_bucket_name)
+                print("Info: URL Path: ", self.url_file_path)
+                print("Info: Sheet name to parse: ", self.sheet_name)
+                if self.aws_bucket_name and self.url_file_path and \
+                        self.sheet_name:
                     ret_status = True
                 else:
                     print("\nInvalid Argument!!")
@@ -260,18 +412,29 @@ class DataIngestion(object):
         try:
             print("\nPerforming data ingestion task."
                   " Waiting for the response...")
-            self.__response = requests.get(self.__url_file_path)
-            if self.__response is not None:
+            # Retrying the request on transient server errors and streaming the
+            # body so that it is not buffered in memory
+            self.__session = requests.Session()
+            retry_adapter = HTTPAdapter(max_retries=Retry(
+                total=HTTP_RETRY_TOTAL,
+                backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+                status_forcelist=HTTP_RETRY_STATUS_LIST))
+            self.__session.mount("http://", retry_adapter)
+            self.__session.mount("https://", retry_adapter)
+            self.response = self.__session.get(self.url_file_path,
+                                               stream=True,
+                                               timeout=HTTP_TIMEOUT)
+            if self.response is not None:
                 print("Info: Successfully received the response for the url "
-                      "path. [Status code:", self.__response.status_code, "]")
+                      "path. [Status code:", self.response.status_code, "]")
                 ret_status = True
             else:
                 print("Info: Unable to get the response for the url path"
-                      "\nStatus code: ", self.__response.status_code)
+                      "\nStatus code: ", self.response.status_code)
 
         except Exception as e:
             print("Error: Establishing connection to the url: ",
-                  self.__url_file_path, "\nException: ", e)
+                  self.url_file_path, "\nException: ", e)
 
         return ret_status
 
@@ -285,7 +448,7 @@ class DataIngestion(object):
         ret_status = True
         try:
             # Getting the content-type from the response object
-            content_type = self.__response.headers.get('Content-Type', None)
+            content_type = self.response.headers.get('Content-Type', None)
 
             if content_type is None:
                 ret_status = False
@@ -298,43 +461,160 @@ class DataIngestion(object):
 
         except Exception as e:
             print("Error: Unable to get the downloadable status of url: ",
-                  self.__url_file_path, "\nException: ", e)
+                  self.url_file_path, "\nException: ", e)
 
         return ret_status
 
-    def get_extensions(self, strict_flag=False, all_ext_flag=False):
+    def get_extensions(self):
         """
-        Function to get the extension(s) of the requested url.
-
-        Args:
-            strict_flag (bool): The strict flag specifies the list of known MIME
-                                types registered with IANA. If False is given
-                                some additional non-standard commonly used MIME
-                                types are also considered.
-            all_ext_flag (bool): Flag to ensure to get all the extensions for
-                                 the requested url path
+        Function to get the extension(s) of the requested url from its
+        content type.
         """
         extension_list = list()
         try:
             # Getting the content-type from the response object
-            content_type = self.__response.headers.get('Content-Type', None)
+            content_type = self.response.headers.get('Content-Type', None)
 
             if content_type is not None:
-                if all_ext_flag:
-                    extension_list = mimetypes.guess_all_extensions(
-                        content_type,
-                        strict_flag)
-                else:
-                    extension_list = mimetypes.guess_extension(
-                        content_type,
-                        strict_flag).split()
+                # Ignoring the parameters like charset of the content type
+                extension_list = list(EXTENSIONS_BY_CONTENT_TYPE.get(
+                    content_type.split(';')[0].strip().lower(), ()))
 
         except Exception as e:
             print("Error: In getting the extension(s) of url path: ",
-                  self.__url_file_path, "\nException: ", e)
+                  self.url_file_path, "\nException: ", e)
 
         return extension_list
 
+    def _open_output_file(self, file_path,
+                          flags=os.O_WRONLY | os.O_CREAT | os.O_TRUNC):
+        """
+        Function to open the file of output directory relative to its already
+        opened file descriptor, so that the directory path is not resolved
+        again for every file operation. The file is opened by its path when
+        the directory is not opened.
+
+        Args:
+            file_path (str): Path of the file in the output directory
+            flags (int): Flags of os.open, by default the file is created or
+                         truncated for writing
+
+        Return:
+            int: File descriptor of the opened file
+        """
+        flags |= OUTPUT_FILE_FLAGS_BINARY
+        if self.__output_dir_fd is None:
+            return os.open(file_path, flags, 0o666)
+
+        return os.open(os.path.basename(file_path), flags, 0o666,
+                       dir_fd=self.__output_dir_fd)
+
+    def get_range_validator(self):
+        """
+        Function to get the validator of the response sent in If-Range, so
+        that every range is served from the same version of the file.
+
+        Return:
+            str: Strong ETag or Last-Modified of the response, None if the
+                 response has none
+        """
+        headers = self.response.headers
+        etag = headers.get('ETag')
+        # Weak ETags are not allowed in If-Range
+        if etag is not None and not etag.startswith('W/'):
+            return etag
+
+        return headers.get('Last-Modified')
+
+    def get_range_download_size(self):
+        """
+        Function to check whether the url file path can be downloaded in byte
+        ranges and get the size of the file.
+
+        Return:
+            int: Size of the file in bytes, 0 if ranges are not supported
+        """
+        total_size = 0
+        try:
+            headers = self.response.headers
+            # Ranges are applied on the encoded body, so skipping the
+            # compressed responses. The ranges are requested only when they
+            # can be tied to the version of the file of the response
+            if headers.get('Accept-Ranges', '').lower() == 'bytes' and \
+                    headers.get('Content-Encoding') is None and \
+                    self.get_range_validator() is not None:
+                total_size = int(headers.get('Content-Length', 0))
+
+        except Exception as e:
+            print("Error: Unable to get the range download size of url: ",
+                  self.url_file_path, "\nException: ", e)
+
+        return total_size
+
+    def _download_ranges(self, file_desc, total_size,
+                         max_workers=RANGE_DOWNLOAD_WORKERS,
+                         part_size=RANGE_DOWNLOAD_PART_SIZE):
+        """
+        Function to download the file in parallel parts using HTTP range
+        requests. The parts are requested from the final url of the response
+        with If-Range, so that a changed file is not mixed with the parts
+        already written. Every part is written at its own offset of the
+        pre-sized output file.
+
+        Args:
+            file_desc (int): File descriptor of the output file opened for
+                             writing
+            total_size (int): Size of the file in bytes
+            max_workers (int): Number of parts to be downloaded in parallel
+            part_size (int): Size of each part in bytes
+
+        Raises:
+            IOError: When the server does not return the requested range of
+                     the same file.
+        """
+        url = self.response.url
+        range_validator = self.get_range_validator()
+        byte_ranges = [(start, min(start + part_size, total_size) - 1)
+                       for start in range(0, total_size, part_size)]
+
+        def download_range(byte_range):
+            """Downloads a byte range and writes it at its offset"""
+            start, end = byte_range
+            response = self.__session.get(
+                url,
+                headers={'Range': 'bytes=%d-%d' % (start, end),
+                         'If-Range': range_validator},
+                stream=True,
+                timeout=HTTP_TIMEOUT)
+            with response:
+                # The whole file is served instead when it has changed
+                if response.status_code != requests.codes.partial_content:
+                    raise IOError("Range bytes=%d-%d not served. [Status "
+                                  "code: %s]" % (start, end,
+                                                 response.status_code))
+
+                content_range = response.headers.get('Content-Range')
+                if content_range != 'bytes %d-%d/%d' % (start, end,
+                                                        total_size):
+                    raise IOError("Range bytes=%d-%d served as: %s" %
+                                  (start, end, content_range))
+
+                offset = start
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    view = memoryview(chunk)
+                    while view:
+                        written = os.pwrite(file_desc, view, offset)
+                        view = view[written:]
+                        offset += written
+
+            if offset != end + 1:
+                raise IOError("Range bytes=%d-%d incomplete." % (start, end))
+
+        os.ftruncate(file_desc, total_size)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consuming the results to raise the errors of the parts
+            list(executor.map(download_range, byte_ranges))
+
     def download(self):
         """
         Function to download the file from the url.
@@ -344,129 +624,665 @@ class DataIngestion(object):
         """
         ret_status = False
         try:
-            if self.__response.status_code == requests.codes.ok:
-                # Writing the file to local
-                if os.path.isfile(OUTPUT_FILE_PATH):
-                    os.remove(OUTPUT_FILE_PATH)
-                    print("Info: Deleted the old file: ", OUTPUT_FILE_PATH)
-
+            if self.response.status_code == requests.codes.ok:
+                # Writing the file to local, truncating the old file
                 print("Info: Downloading the url file path. Please wait...")
-                with open(OUTPUT_FILE_PATH, "wb") as file_object:
-                    file_object.write(self.__response.content)
-
-                if os.path.isfile(OUTPUT_FILE_PATH):
-                    print("Info: Created output file successfully. "
-                          "Path:", OUTPUT_FILE_PATH)
+                file_desc = self._open_output_file(self.__output_file_path)
+                try:
+                    total_size = self.get_range_download_size()
+                    if total_size > RANGE_DOWNLOAD_PART_SIZE and \
+                            hasattr(os, 'pwrite'):
+                        # Server supports byte ranges, fetching the parts in
+                        # parallel instead of over the single streamed
+                        # response. The parts are written at their offsets
+                        # with os.pwrite, which is not available on windows
+                        print("Info: Downloading", total_size, "bytes in "
+                              "parallel parts...")
+                        self.response.close()
+                        self._download_ranges(file_desc, total_size)
+                    else:
+                        # Streaming the raw response body to the file in
+                        # chunks
+                        self.response.raw.decode_content = True
+                        with os.fdopen(file_desc, "wb",
+                                       closefd=False) as file_object:
+                            shutil.copyfileobj(self.response.raw,
+                                               file_object,
+                                               DOWNLOAD_CHUNK_SIZE)
 
                     # Getting size of the file
-                    file_size = os.path.getsize(OUTPUT_FILE_PATH)
+                    file_size = os.fstat(file_desc).st_size
+                finally:
+                    os.close(file_desc)
 
-                    if file_size > 0:
-                        print("Info: Contents written in the file"
-                              " successfully.")
-                        ret_status = True
+                print("Info: Created output file successfully. "
+                      "Path:", self.__output_file_path)
+
+                if file_size > 0:
+                    print("Info: Contents written in the file"
+                          " successfully.")
+                    ret_status = True
 
-                    else:
-                        print("Info: Output file empty/Unable to write "
-                              "contents in it.")
                 else:
-                    print("Info: Unable to create new output file."
-                          "\nPath: ", OUTPUT_FILE_PATH)
+                    print("Info: Output file empty/Unable to write "
+                          "contents in it.")
 
         except Exception as e:
             print("Error: Downloading the file from the url path: ",
-                  self.__url_file_path, "\nException: ", e)
+                  self.url_file_path, "\nException: ", e)
 
         return ret_status
 
+    @staticmethod
+    def _mangle_header(header):
+        """
+        Function to name the blank and duplicated columns of the header row the
+        same way as pandas, so that no column is dropped from the records.
+
+        Args:
+            header (iterable): Values of the header row
+
+        Return:
+            list: Unique column names, blank columns named "Unnamed: <index>"
+                  and duplicated columns suffixed with ".<count>"
+        """
+        columns = list()
+        counts = dict()
+        for index, column in enumerate(header):
+            if column is None or column == "":
+                column = "Unnamed: %d" % index
+
+            cur_count = counts.get(column, 0)
+            while cur_count > 0:
+                counts[column] = cur_count + 1
+                column = "%s.%d" % (column, cur_count)
+                cur_count = counts.get(column, 0)
+
+            counts[column] = cur_count + 1
+            columns.append(column)
+
+        return columns
+
+    @staticmethod
+    def _convert_calamine_value(value):
+        """
+        Function to convert the cell value of calamine to the value given by
+        the pandas reader.
+
+        Args:
+            value: Cell value given by calamine
+
+        Return:
+            None for the empty cells, int for the integral numbers and
+            datetime for the date cells
+        """
+        # Calamine gives empty string for the empty cells
+        if value == "":
+            return None
+
+        # Calamine gives every number as float
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+
+        # Calamine gives date for the datetime cells at midnight
+        if isinstance(value, datetime.date) and \
+                not isinstance(value, datetime.datetime):
+            return datetime.datetime.combine(value, datetime.time())
+
+        return value
+
+    @staticmethod
+    def _iter_xlsx_records(file_path, sheet_name):
+        """
+        Function to iterate the xlsx sheet rows using the read-only mode of
+        openpyxl, without loading the whole workbook in memory.
+
+        Args:
+            file_path (str): Path of the xlsx file to be parsed
+            sheet_name (str): Name of the sheet to be parsed
+
+        Yields:
+            dict: Dictionary for every row with first row as keys
+        """
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook[sheet_name.strip()].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is not None:
+                header = DataIngestion._mangle_header(header)
+                # The rows go up to the stored dimension of the sheet, which
+                # includes the empty rows carrying only the formatting. The
+                # blank rows are held back until a row with values follows,
+                # so that the trailing ones are dropped as pandas does
+                blank_rows_count = 0
+                for row in rows:
+                    if all(value is None for value in row):
+                        blank_rows_count += 1
+                        continue
+
+                    for _ in range(blank_rows_count):
+                        yield dict.fromkeys(header)
+                    blank_rows_count = 0
+
+                    # Padding the short rows, so that no key is dropped
+                    row = row + (None,) * (len(header) - len(row))
+                    yield dict(zip(header, row))
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _parse_xlsx_streaming(file_path, sheet_name):
+        """
+        Function to parse the xlsx sheet row by row using the read-only mode of
+        openpyxl. The sheet is streamed again on every iteration of the
+        records.
+
+        Args:
+            file_path (str): Path of the xlsx file to be parsed
+            sheet_name (str): Name of the sheet to be parsed
+
+        Return:
+            callable: Function returning a new iterator of the dictionary for
+                      every row, None if the sheet is not found
+        """
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet_names = workbook.sheetnames
+        finally:
+            workbook.close()
+
+        # Checking for the sheet name in the downloaded excel file
+        if sheet_name.strip() not in sheet_names:
+            print("Info: Sheet name -", sheet_name, "not found in file.")
+            return None
+
+        print("Info: Sheet name -", sheet_name, "found in the file.")
+        return functools.partial(DataIngestion._iter_xlsx_records, file_path,
+                                 sheet_name)
+
+    @staticmethod
+    def _parse_calamine_streaming(file_path, sheet_name):
+        """
+        Function to parse the sheet rows directly from calamine without
+        building a pandas data frame.
+
+        Args:
+            file_path (str): Path of the excel file to be parsed
+            sheet_name (str): Name of the sheet to be parsed
+
+        Return:
+            callable: Function returning a new iterator of the dictionary for
+                      every row, None if the sheet is not found
+        """
+        workbook = CalamineWorkbook.from_path(file_path)
+
+        # Checking for the sheet name in the downloaded excel file
+        if sheet_name.strip() not in workbook.sheet_names:
+            print("Info: Sheet name -", sheet_name, "not found in file.")
+            return None
+
+        print("Info: Sheet name -", sheet_name, "found in the file.")
+        # Keeping the leading empty rows and columns as pandas does
+        rows = workbook.get_sheet_by_name(sheet_name.strip()).to_python(
+            skip_empty_area=False)
+        if not rows:
+            return lambda: iter(())
+
+        header = DataIngestion._mangle_header(
+            [DataIngestion._convert_calamine_value(value)
+             for value in rows[0]])
+
+        def iter_records():
+            """Yields the dictionary for every row"""
+            for row in itertools.islice(rows, 1, None):
+                yield dict(zip(header, [
+                    DataIngestion._convert_calamine_value(value)
+                    for value in row]))
+
+        return iter_records
+
+    @staticmethod
+    def _to_arrow_table(xls_data_df):
+        """
+        Function to convert the data frame to a pyarrow table, with NaN stored
+        as null in the columnar buffers.
+
+        Args:
+            xls_data_df (pandas.DataFrame): Data frame of the parsed sheet
+
+        Return:
+            pyarrow.Table: None if pyarrow is not available or the columns
+                           hold mixed types
+        """
+        xls_data_table = None
+        if pa is not None:
+            try:
+                xls_data_table = pa.Table.from_pandas(xls_data_df,
+                                                      preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                print("Info: Unable to convert the data frame to arrow table."
+                      "\nException: ", e)
+
+        return xls_data_table
+
+    def _parse_with_pandas(self):
+        """
+        Function to parse the sheet of downloaded file using pandas data frame
+
+        Return:
+            pandas.DataFrame: None if the sheet is not found or empty
+        """
+        # Reading the excel file using pandas
+        pd_xls_obj = pd.ExcelFile(self.__output_file_path)
+
+        # Checking for the sheet name in the downloaded excel file
+        if self.sheet_name.strip() not in pd_xls_obj.sheet_names:
+            print("Info: Sheet name -", self.sheet_name,
+                  "not found in file.")
+            return None
+
+        print("Info: Sheet name -", self.sheet_name, "found in the file.")
+
+        # Read the excel sheet
+        xls_data_df = pd.read_excel(pd_xls_obj, self.sheet_name)
+        if xls_data_df.empty:
+            print("Info: Unable to read the excel file and convert to "
+                  "data frame")
+            return None
+
+        print("Info: Successfully converted the excel content to data frame")
+        return xls_data_df
+
+    @staticmethod
+    def _get_data_frame_records(xls_data_df, xls_data_table):
+        """
+        Function to get the records of the data frame parsed by pandas
+
+        Args:
+            xls_data_df (pandas.DataFrame): Data frame of the parsed sheet
+            xls_data_table (pyarrow.Table): Arrow table of the data frame, None
+                                            if it could not be converted
+
+        Return:
+            callable: Function returning a new iterator of the dictionary for
+                      every row
+        """
+        if xls_data_table is not None:
+            # Creating a dictionary for every row from the columnar batches,
+            # the NaN are already converted to null
+            return lambda: itertools.chain.from_iterable(
+                batch.to_pylist() for batch in xls_data_table.to_batches(
+                    max_chunksize=ARROW_BATCH_SIZE))
+
+        # Replacing the NaN with "None" only in the columns holding missing
+        # values, the other columns keep their dtype. orjson already writes NaN
+        # as null and the parquet writer stores it as null
+        if orjson is None:
+            nan_columns = xls_data_df.columns[xls_data_df.isna().any()]
+            if len(nan_columns):
+                nan_data_df = xls_data_df[nan_columns]
+                xls_data_df[nan_columns] = nan_data_df.astype(object).where(
+                    nan_data_df.notna(), None)
+
+        # Creating a dictionary for every row with first row as key
+        columns = xls_data_df.columns.tolist()
+        return lambda: (dict(zip(columns, row)) for row in
+                        xls_data_df.itertuples(index=False, name=None))
+
+    @staticmethod
+    def _json_default(value):
+        """
+        Function to convert the values which are not natively serializable by
+        orjson, like pandas timestamps.
+
+        Args:
+            value: Value to be converted
+
+        Raises:
+            TypeError: When the value can not be converted.
+        """
+        # NaT and other missing values are not equal to themselves
+        if value != value:
+            return None
+
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+
+        raise TypeError("Type is not JSON serializable: %s" %
+                        type(value).__name__)
+
+    @staticmethod
+    def _get_value_kind(value):
+        """
+        Function to get the kind of the cell value used for the parquet column
+        type.
+
+        Args:
+            value: Cell value of the record
+
+        Return:
+            type: None for the missing values (None, NaN and NaT), datetime for
+                  both date and datetime values
+        """
+        # NaN and NaT are not equal to themselves
+        if value is None or value != value:
+            return None
+
+        # The numpy scalars of the data frame are kept as their python kinds
+        if isinstance(value, (bool, np.bool_)):
+            return bool
+
+        for kind, types in ((int, numbers.Integral), (float, numbers.Real),
+                            (str, str),
+                            (datetime.datetime, datetime.date),
+                            (datetime.time, datetime.time),
+                            (datetime.timedelta, datetime.timedelta)):
+            if isinstance(value, types):
+                return kind
+
+        return object
+
+    @staticmethod
+    def _get_parquet_type(kinds):
+        """
+        Function to get the parquet column type unified for all the value kinds
+        found in the column.
+
+        Args:
+            kinds (set): Kinds of the values of the column
+
+        Return:
+            pyarrow.DataType: string for the mixed or unknown kinds
+        """
+        kinds = kinds - {None}
+        if kinds == {int, float}:
+            return pa.float64()
+
+        if len(kinds) == 1:
+            return {
+                bool: pa.bool_(),
+                int: pa.int64(),
+                float: pa.float64(),
+                str: pa.string(),
+                datetime.datetime: pa.timestamp('us'),
+                datetime.time: pa.time64('us'),
+                datetime.timedelta: pa.duration('us'),
+            }.get(kinds.pop(), pa.string())
+
+        return pa.string()
+
+    @staticmethod
+    def _to_parquet_value(value, column_type):
+        """
+        Function to convert the cell value to the parquet column type
+
+        Args:
+            value: Cell value of the record
+            column_type (pyarrow.DataType): Parquet type of the column
+
+        Return:
+            Value to be stored, None for the missing values
+        """
+        # NaN and NaT are stored as null
+        if value is None or value != value:
+            return None
+
+        if column_type == pa.string() and not isinstance(value, str):
+            return str(value)
+
+        if pa.types.is_timestamp(column_type) and \
+                not isinstance(value, datetime.datetime):
+            return datetime.datetime.combine(value, datetime.time())
+
+        return value
+
+    @staticmethod
+    def _write_parquet_records(records, get_records, file_object):
+        """
+        Function to write the records as a zstd compressed parquet file. The
+        column types are unified over all the records in a first pass, then
+        the records are written in batches in a second pass, so that only one
+        batch is held in memory.
+
+        Args:
+            records (iterator): Dictionary for every row, used for the types
+            get_records (callable): Function returning a new iterator of the
+                                    records, used for writing
+            file_object: Binary file object the parquet is written to, it is
+                         left open for the caller
+
+        Return:
+            int: Number of records written
+        """
+        # Getting the kinds of the values of every column
+        column_kinds = dict()
+        for record in records:
+            for column, value in record.items():
+                column_kinds.setdefault(column, set()).add(
+                    DataIngestion._get_value_kind(value))
+
+        columns = list(column_kinds)
+        schema = pa.schema(
+            [(str(column), DataIngestion._get_parquet_type(kinds))
+             for column, kinds in column_kinds.items()])
+
+        records_count = 0
+        records = get_records()
+        with pq.ParquetWriter(
+                file_object, schema, compression=PARQUET_COMPRESSION,
+                compression_level=PARQUET_COMPRESSION_LEVEL) as parquet_writer:
+            while True:
+                batch = list(itertools.islice(records, ARROW_BATCH_SIZE))
+                if not batch:
+                    break
+
+                column_arrays = [
+                    pa.array([DataIngestion._to_parquet_value(
+                        record.get(column), field.type) for record in batch],
+                        type=field.type)
+                    for column, field in zip(columns, schema)]
+                parquet_writer.write_table(
+                    pa.Table.from_arrays(column_arrays, schema=schema))
+                records_count += len(batch)
+
+        return records_count
+
+    @staticmethod
+    def _write_json_records(records, file_object, compress=False):
+        """
+        Function to write the records as a JSON array, one record at a time, so
+        that the complete list is never built in memory.
+
+        Args:
+            records (iterable): Dictionary for every row
+            file_object: Binary file object the JSON is written to, it is
+                         left open for the caller
+            compress (bool): Flag to compress the JSON with zstd while writing
+
+        Return:
+            int: Number of records written
+        """
+        if compress:
+            with zstd.ZstdCompressor(
+                    level=ZSTD_COMPRESSION_LEVEL, threads=-1).stream_writer(
+                    file_object, closefd=False) as zstd_writer:
+                return DataIngestion._write_json_records(records, zstd_writer)
+
+        records_count = 0
+        file_object.write(b'[')
+        for record in records:
+            if records_count:
+                file_object.write(b',')
+
+            if orjson is not None:
+                file_object.write(orjson.dumps(
+                    record,
+                    default=DataIngestion._json_default,
+                    option=orjson.OPT_SERIALIZE_NUMPY |
+                    orjson.OPT_NON_STR_KEYS))
+            else:
+                file_object.write(json.dumps(
+                    record,
+                    default=DataIngestion._json_default).encode('utf-8'))
+            records_count += 1
+        file_object.write(b']')
+
+        return records_count
+
+    def _open_output(self):
+        """
+        Function to open the output file. It is streamed straight to the aws
+        s3 bucket in multipart upload when the streamed upload is configured,
+        else written to the local file.
+
+        Return:
+            Binary file object of the output
+        """
+        if OUTPUT_UPLOAD == OUTPUT_UPLOAD_STREAM:
+            return smart_open.open(
+                's3://%s/%s' % (self.aws_bucket_name.lower(),
+                                self.__output_data_key),
+                'wb',
+                compression='disable',
+                transport_params={
+                    'client': S3_CLIENT,
+                    'min_part_size': S3_MULTIPART_CHUNK_SIZE,
+                    'client_kwargs': {
+                        'S3.Client.create_multipart_upload':
+                            self._get_s3_extra_args()
+                    }
+                })
+
+        return os.fdopen(self._open_output_file(self.__output_data_path), "wb",
+                         buffering=OUTPUT_WRITE_BUFFER_SIZE)
+
     def parse_file(self):
         """
         Function to parse the downloaded file. Create the records of dictionary
-        and dump that records as json format
+        and dump that records as parquet or json format
 
         Return:
             bool
         """
         ret_status = False
         try:
-            # Reading the excel file using pandas
-            pd_xls_obj = pd.ExcelFile(OUTPUT_FILE_PATH)
-
-            # Checking for the sheet name in the downloaded excel file
-            if self.__sheet_name.strip() in pd_xls_obj.sheet_names:
-                print("Info: Sheet name -", self.__sheet_name,
-                      "found in the file.")
-
-                # Read the excel sheet
-                xls_data_df = pd.read_excel(OUTPUT_FILE_PATH, self.__sheet_name)
-
-                if not xls_data_df.empty:
-                    print("Info: Successfully converted the excel content to "
-                          "data frame")
-
-                    # Replacing the NaN in data frame with "None"
-                    xls_data_df = xls_data_df.where(pd.notnull(xls_data_df),
-                                                    None)
-
-                    # Creating a list of dictionary with all the rows with first
-                    # row as key in each dictionary
-                    dict_list_records = xls_data_df.to_dict('records')
-
-                    if dict_list_records:
-                        print("Info: Successfully converted the records to "
-                              "dictionary list")
-
-                        # Writing the dumped json object to file
-                        with open(OUTPUT_FILE_JSON, "w") as file_object:
-                            # Dumping the records in JSON format
-                            json.dump(dict_list_records, file_object)
-
-                        if os.path.isfile(OUTPUT_FILE_JSON):
-                            print("Info: Created JSON file successfully. "
-                                  "Path:", OUTPUT_FILE_JSON)
-                            if os.path.getsize(OUTPUT_FILE_JSON) > 0:
-                                print("Info: JSON content written "
-                                      "successfully.")
-                                ret_status = True
-                            else:
-                                print("Info: Unable to write the JSON content.")
+            # Streaming the sheet rows directly when calamine or openpyxl (for
+            # xlsx) is available, else falling back to pandas data frame
+            xls_data_table = None
+            if CalamineWorkbook is not None:
+                get_records = DataIngestion._parse_calamine_streaming(
+                    self.__output_file_path, self.sheet_name)
+            elif load_workbook is not None and \
+                    self.__output_file_path.lower().endswith('.xlsx'):
+                get_records = DataIngestion._parse_xlsx_streaming(
+                    self.__output_file_path, self.sheet_name)
+            else:
+                get_records = None
+                xls_data_df = self._parse_with_pandas()
+                if xls_data_df is not None:
+                    xls_data_table = DataIngestion._to_arrow_table(
+                        xls_data_df)
+                    get_records = DataIngestion._get_data_frame_records(
+                        xls_data_df, xls_data_table)
+
+            # Checking for the first record before creating the output
+            dict_records = get_records() if get_records is not None else None
+            first_record = next(dict_records, None) \
+                if dict_records is not None else None
+            if first_record is not None:
+                dict_records = itertools.chain([first_record], dict_records)
+
+                # Writing the records in parquet or JSON format while parsing.
+                # The MD5 digest sent with the upload of the local file is
+                # computed in the same pass, the streamed output needs none
+                hasher = hashlib.md5() \
+                    if OUTPUT_UPLOAD == OUTPUT_UPLOAD_FILE else None
+                with self._open_output() as file_object:
+                    hashing_writer = HashingWriter(file_object, hasher)
+                    if self.__output_format == OUTPUT_FORMAT_JSON:
+                        records_count = DataIngestion._write_json_records(
+                            dict_records, hashing_writer,
+                            OUTPUT_COMPRESSION == OUTPUT_COMPRESSION_ZSTD)
+                    elif xls_data_table is not None:
+                        # Writing the arrow table of the data frame as it is
+                        pq.write_table(
+                            xls_data_table, hashing_writer,
+                            compression=PARQUET_COMPRESSION,
+                            compression_level=PARQUET_COMPRESSION_LEVEL)
+                        records_count = xls_data_table.num_rows
                     else:
-                        print("Info: Unable to converts the records to "
-                              "dictionary list")
+                        records_count = DataIngestion._write_parquet_records(
+                            dict_records, get_records, hashing_writer)
+                if hasher is not None:
+                    self.__output_data_md5 = base64.b64encode(
+                        hasher.digest()).decode('ascii')
+
+                print("Info: Successfully converted", records_count,
+                      "records to dictionary")
+
+                # Getting the size of the output from the written bytes
+                if hashing_writer.size <= 0:
+                    print("Info: Unable to write the output content.")
+                elif OUTPUT_UPLOAD == OUTPUT_UPLOAD_STREAM:
+                    print("Info: Output content streamed successfully to AWS "
+                          "S3 bucket:", self.aws_bucket_name.lower())
+                    ret_status = True
                 else:
-                    print("Info: Unable to read the excel file and convert to "
-                          "data frame")
+                    print("Info: Created output file successfully. "
+                          "Path:", self.__output_data_path)
+                    print("Info: Output content written successfully.")
+                    ret_status = True
             else:
-                print("Info: Sheet name -", self.__sheet_name,
-                      "not found in file.")
+                print("Info: Unable to converts the records to "
+                      "dictionary list")
         except Exception as e:
             print("Error: Parsing the excel file.\nException: ", e)
 
         return ret_status
 
-    def upload_to_aws_s3(self):
+    def check_aws_s3_bucket(self):
         """
-        Function to connect aws s3 bucket and upload the created json file
+        Function to check the aws s3 bucket existence
+
+        Return:
+            bool: True if the bucket is present
+
+        Raises:
+            ClientError: When the bucket existence can not be checked.
+        """
+        bucket_name = self.aws_bucket_name.lower()
+        print("Info: Checking the AWS S3 bucket:", bucket_name)
+        # Checking current s3 bucket existence in aws
+        try:
+            S3_CLIENT.head_bucket(Bucket=bucket_name)
+        except ClientError as ce:
+            if ce.response['Error']['Code'] not in ('404', 'NoSuchBucket'):
+                raise
+
+            print("Info: AWS S3 bucket:", bucket_name, "not found.")
+            return False
+
+        return True
+
+    def prepare_aws_s3_bucket(self, bucket_check):
+        """
+        Function to create the aws s3 bucket if it is not present
+
+        Args:
+            bucket_check (concurrent.futures.Future): Result of the bucket
+                                                      existence check
 
         Return:
             bool
         """
         ret_status = False
+        bucket_name = self.aws_bucket_name.lower()
         cr_bucket_status = None
         try:
-            print("Info: Uploading file to AWS S3 bucket. Please wait...")
-            # Checking current s3 bucket existence in aws
-            # Creating the object of s3
-            s3_obj = boto3.resource("s3")
-            if not self.__aws_bucket_name.lower() in [each_bucket.name.lower()
-                                                      for each_bucket in
-                                                      s3_obj.buckets.all()]:
-                print("Info: AWS S3 bucket:", self.__aws_bucket_name.lower(),
-                      "not found.")
-
+            if not bucket_check.result():
                 print("Info: Creating the AWS S3 bucket...")
-                cr_bucket_status = s3_obj.create_bucket(
-                    Bucket=self.__aws_bucket_name.lower(),
+                cr_bucket_status = S3_CLIENT.create_bucket(
+                    Bucket=bucket_name,
                     CreateBucketConfiguration={
                         'LocationConstraint': 'ap-south-1'
                     }
@@ -474,25 +1290,188 @@ class DataIngestion(object):
 
                 if cr_bucket_status is None:
                     print("Info: Failed to create AWS S3 bucket:",
-                          self.__aws_bucket_name.lower())
+                          bucket_name)
                     sys.exit(S3_BUCKET_CR_ERR)
 
-            # Uploading the file to bucket
-            json_buf = open(OUTPUT_FILE_JSON, 'rb')
-            response = s3_obj.Bucket(self.__aws_bucket_name.lower()).put_object(
-                ACL='public-read',
-                Key=JSON_FILE_PATH_ON_AWS,
-                Body=json_buf
-            )
-            if response:
-                print("Info: File:", OUTPUT_FILE_JSON,
-                      "uploaded successfully to AWS S3 bucket:",
-                      self.__aws_bucket_name.lower())
-                ret_status = True
+            ret_status = True
+
+        except Exception as e:
+            print("Error: Checking the AWS s3 bucket:", bucket_name,
+                  "\nException:", e)
+
+        return ret_status
+
+    def _get_s3_extra_args(self):
+        """
+        Function to get the extra arguments of the output object uploaded to
+        aws s3 bucket
+
+        Return:
+            dict
+        """
+        if self.__output_format == OUTPUT_FORMAT_PARQUET:
+            extra_args = {'ACL': 'public-read',
+                          'ContentType': CONTENT_TYPE_PARQUET}
+        else:
+            extra_args = {'ACL': 'public-read',
+                          'ContentType': CONTENT_TYPE_JSON}
+            if OUTPUT_COMPRESSION == OUTPUT_COMPRESSION_ZSTD:
+                extra_args['ContentEncoding'] = 'zstd'
+
+        return extra_args
+
+    def upload_to_aws_s3(self):
+        """
+        Function to connect aws s3 bucket and upload the created output file
+
+        Return:
+            bool
+        """
+        ret_status = False
+        bucket_name = self.aws_bucket_name.lower()
+        if OUTPUT_UPLOAD == OUTPUT_UPLOAD_STREAM:
+            print("Info: Output content already streamed to AWS S3 bucket:",
+                  bucket_name)
+            return True
+
+        try:
+            print("Info: Uploading file to AWS S3 bucket. Please wait...")
+            with os.fdopen(self._open_output_file(self.__output_data_path,
+                                                  os.O_RDONLY),
+                           'rb') as data_buf:
+                if os.fstat(data_buf.fileno()).st_size <= \
+                        S3_MULTIPART_THRESHOLD:
+                    # Uploading the file to bucket in a single put with the
+                    # MD5 digest computed while writing it
+                    S3_CLIENT.put_object(
+                        Bucket=bucket_name,
+                        Key=self.__output_data_key,
+                        Body=data_buf,
+                        ContentMD5=self.__output_data_md5,
+                        **self._get_s3_extra_args()
+                    )
+                else:
+                    # Uploading the file to bucket in parallel parts, every
+                    # part is checked by its own digest
+                    transfer_config = TransferConfig(
+                        multipart_threshold=S3_MULTIPART_THRESHOLD,
+                        multipart_chunksize=S3_MULTIPART_CHUNK_SIZE,
+                        max_concurrency=S3_MAX_CONCURRENCY,
+                        use_threads=True
+                    )
+                    S3_CLIENT.upload_fileobj(
+                        data_buf,
+                        bucket_name,
+                        self.__output_data_key,
+                        ExtraArgs=self._get_s3_extra_args(),
+                        Config=transfer_config
+                    )
+
+            print("Info: File:", self.__output_data_path,
+                  "uploaded successfully to AWS S3 bucket:",
+                  bucket_name)
+            ret_status = True
 
         except Exception as e:
-            print("Error: Uploading the file to AWS s3 bucket:",
-                  self.__aws_bucket_name.lower(), "\nException:", e)
+            print("Error: Uploading the file to AWS s3 bucket:", bucket_name,
+                  "\nException:", e)
+
+        return ret_status
+
+    def run(self):
+        """
+        Function to perform the data ingestion task for the bucket name, url
+        file path and sheet name held by the object
+
+        Return:
+            int: Return code of the data ingestion task
+        """
+        ret_status = GENERIC_ERR
+        executor = ThreadPoolExecutor(max_workers=1)
+        task_dir_path = None
+        try:
+            # Creating output directory if not created. Every task works in
+            # its own sub directory, so that the concurrent tasks do not
+            # overwrite the files of each other. The sub directory is opened
+            # once for the file operations of the task where supported
+            os.makedirs(OUTPUT_DIR_PATH, exist_ok=True)
+            task_dir_path = tempfile.mkdtemp(prefix='dataingestion-',
+                                             dir=OUTPUT_DIR_PATH)
+            if OUTPUT_DIR_FD_SUPPORTED:
+                self.__output_dir_fd = os.open(task_dir_path,
+                                               os.O_RDONLY | os.O_DIRECTORY)
+            self.__output_data_path = os.path.join(
+                task_dir_path, os.path.basename(self.__output_data_path))
+
+            # Invoking function to request to the url path and get response
+            status_connect = self.connect()
+            if status_connect:
+                # Invoking function to check if url is downloadable or not
+                status_downloadable = self.is_downloadable()
+                if status_downloadable:
+                    # By default getting the extension from the path, ignoring
+                    # the query string of the url
+                    file_ext = os.path.splitext(
+                        urlparse(self.url_file_path).path)[1]
+
+                    # Invoking function to get the extension list
+                    ext_list = self.get_extensions()
+                    if ext_list and file_ext in ext_list:
+                        self.__output_file_path = os.path.join(
+                            task_dir_path,
+                            os.path.basename(OUTPUT_FILE_PATH) + file_ext)
+                        print("Info: Output file path: ",
+                              self.__output_file_path)
+                        # Checking the aws s3 bucket in background while the
+                        # file is downloaded
+                        bucket_check = executor.submit(
+                            self.check_aws_s3_bucket)
+
+                        # Invoking function to download the file
+                        status_download = self.download()
+                        if status_download:
+                            # The bucket must be ready before parsing when the
+                            # output is streamed to it, else it is created
+                            # only for a parsed output
+                            if OUTPUT_UPLOAD == OUTPUT_UPLOAD_STREAM:
+                                status_parse = self.prepare_aws_s3_bucket(
+                                    bucket_check) and self.parse_file()
+                            else:
+                                status_parse = self.parse_file() and \
+                                    self.prepare_aws_s3_bucket(bucket_check)
+
+                            if status_parse:
+                                status_upload = self.upload_to_aws_s3()
+                                if status_upload:
+                                    ret_status = SUCCESS
+                    else:
+                        print("Info: Unable to get the extensions of the "
+                              "url file path")
+                else:
+                    print("Info: Given url: %s path is not downloadable." %
+                          self.url_file_path)
+            else:
+                print("Info: Unable to get response for the url: ",
+                      self.url_file_path)
+
+        except Exception as e:
+            print("Error: Performing the data ingestion process..."
+                  "\nException: ", e)
+
+        finally:
+            executor.shutdown()
+            if self.__output_dir_fd is not None:
+                os.close(self.__output_dir_fd)
+                self.__output_dir_fd = None
+            # Removing the files of the task once uploaded or failed
+            if task_dir_path is not None:
+                shutil.rmtree(task_dir_path, ignore_errors=True)
+            # Releasing the pooled connections of the url requests
+            if self.response is not None:
+                self.response.close()
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
 
         return ret_status
 
@@ -502,50 +1481,11 @@ class DataIngestion(object):
         required task
         """
         ret_status = GENERIC_ERR
-        global OUTPUT_FILE_PATH
         try:
             # Invoking the function to get the command line argument input
             status_argv = self.get_cmd_argv()
             if status_argv:
-                # Creating output directory if not created
-                if not os.path.exists(os.path.dirname(OUTPUT_FILE_PATH)):
-                    os.makedirs(os.path.dirname(OUTPUT_FILE_PATH))
-
-                # Invoking function to request to the url path and get response
-                status_connect = self.connect()
-                if status_connect:
-                    # Invoking function to check if url is downloadable or not
-                    status_downloadable = self.is_downloadable()
-                    if status_downloadable:
-                        # By default getting the extension from the path
-                        file_ext = self.__url_file_path.split('.')[-1] if len(
-                            self.__url_file_path.split('.')) > 0 else ""
-
-                        file_ext = "." + file_ext.strip()
-
-                        # Invoking function to get the extension list
-                        ext_list = self.get_extensions(False, True)
-                        if ext_list and file_ext in ext_list:
-                            OUTPUT_FILE_PATH = OUTPUT_FILE_PATH + file_ext
-                            print("Info: Output file path: ", OUTPUT_FILE_PATH)
-                            # Invoking function to download the file
-                            status_download = self.download()
-                            if status_download:
-                                status_parse = self.parse_file()
-
-                                if status_parse:
-                                    status_upload = self.upload_to_aws_s3()
-                                    if status_upload:
-                                        ret_status = SUCCESS
-                        else:
-                            print("Info: Unable to get the extensions of the "
-                                  "url file path")
-                    else:
-                        print("Info: Given url: %s path is not downloadable." %
-                              self.__url_file_path)
-                else:
-                    print("Info: Unable to get response for the url: ",
-                          self.__url_file_path)
+                ret_status = self.run()
             else:
                 print("Error: In getting input from command line argument.")
 
@@ -556,6 +1496,23 @@ class DataIngestion(object):
         return ret_status
 
 
+def handler(event, context):
+    """
+    AWS lambda entry point to perform the data ingestion task. The heavy
+    imports and the s3 client are initialized once per container at module
+    load and reused by the warm invocations.
+
+    Args:
+        event (dict): Lambda event holding the 'bucket', 'url' and 'sheet'
+        context: Lambda context object
+
+    Return:
+        int: Return code of the data ingestion task
+    """
+    di_object = DataIngestion(event['bucket'], event['url'], event['sheet'])
+    return di_object.run()
+
+
 # Entry section
 if __name__ == '__main__':
     # Creating the object of DataIngestion class and invoking main() function
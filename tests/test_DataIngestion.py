@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Tests of the data ingestion task. The same workbook is parsed by every
+installed reader and the records must not depend on the reader used.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import json
+import shutil
+import datetime
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                os.pardir))
+# The records are compared in the json output
+os.environ.setdefault('DATA_INGESTION_OUTPUT_FORMAT', 'json')
+
+from DataIngestion import DataIngestion as data_ingestion  # noqa: E402
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+except ImportError:
+    Workbook = None
+
+SHEET_NAME = 'Sheet1'
+
+
+@unittest.skipIf(Workbook is None, "openpyxl is required to create the "
+                                   "workbook")
+@unittest.skipIf(data_ingestion.OUTPUT_FORMAT !=
+                 data_ingestion.OUTPUT_FORMAT_JSON or
+                 data_ingestion.OUTPUT_COMPRESSION !=
+                 data_ingestion.OUTPUT_COMPRESSION_NONE or
+                 data_ingestion.OUTPUT_UPLOAD !=
+                 data_ingestion.OUTPUT_UPLOAD_FILE,
+                 "the records are compared in the uncompressed json output "
+                 "file")
+class ReaderParityTest(unittest.TestCase):
+    """
+    The class checks that the calamine, openpyxl and pandas readers give the
+    same records for the same workbook.
+    """
+
+    def setUp(self):
+        """Creates the workbook with its data starting at B3"""
+        self.dir_path = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.dir_path, 'dataingestion.xlsx')
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = SHEET_NAME
+        # Duplicated and blank column names
+        sheet['B3'], sheet['C3'], sheet['E3'] = 'a', 'a', 'date'
+        for row, values in ((4, (1, 1.5, 'x', datetime.datetime(2020, 1, 2))),
+                            (5, (2, 2.5, 'y',
+                                 datetime.datetime(2020, 1, 3, 10, 30))),
+                            # Row 6 is left blank
+                            (7, (3, 3.5, 'z',
+                                 datetime.datetime(2020, 1, 4)))):
+            for column, value in zip('BCDE', values):
+                sheet['%s%d' % (column, row)] = value
+        # Empty cell carrying only the formatting after the data
+        sheet['A10'].font = Font(bold=True)
+        workbook.save(self.file_path)
+
+    def tearDown(self):
+        """Removes the workbook and the outputs"""
+        shutil.rmtree(self.dir_path, ignore_errors=True)
+
+    def parse(self, reader, **modules):
+        """
+        Parses the workbook with the given modules and gets the records of the
+        json output.
+
+        Args:
+            reader (str): Name of the reader, used for the output file name
+            modules: Module attributes to be replaced, None to disable a reader
+
+        Return:
+            list: Records of the json output
+        """
+        output_path = os.path.join(self.dir_path, reader + '.json')
+        di_object = data_ingestion.DataIngestion('bucket', 'url', SHEET_NAME)
+        di_object._DataIngestion__output_file_path = self.file_path
+        di_object._DataIngestion__output_data_path = output_path
+        with mock.patch.multiple(data_ingestion, **modules):
+            self.assertTrue(di_object.parse_file())
+
+        with open(output_path, 'rb') as file_object:
+            return json.load(file_object)
+
+    def test_readers_give_same_records(self):
+        """Every installed reader gives the records of pandas"""
+        expected = self.parse('pandas', CalamineWorkbook=None,
+                              load_workbook=None)
+        self.assertEqual(len(expected), 6)
+        self.assertEqual(list(expected[0]),
+                         ['Unnamed: %d' % index for index in range(5)])
+
+        readers = dict()
+        if data_ingestion.load_workbook is not None:
+            readers['openpyxl'] = dict(CalamineWorkbook=None)
+        if data_ingestion.CalamineWorkbook is not None:
+            readers['calamine'] = dict()
+        if not readers:
+            self.skipTest("calamine and openpyxl are not installed")
+
+        for reader, modules in readers.items():
+            with self.subTest(reader=reader):
+                self.assertEqual(self.parse(reader, **modules), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()